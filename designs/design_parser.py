@@ -1,6 +1,7 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from enum import Enum, auto
+import math
 import json
 
 
@@ -12,22 +13,28 @@ class Side(Enum):
 
     @classmethod
     def from_string(cls, string: str):
-        if string == "left":
-            return cls.LEFT
-        elif string == "right":
-            return cls.RIGHT
-        elif string == "top":
-            return cls.TOP
-        elif string == "bottom":
-            return cls.BOTTOM
-        else:
-            print(f"Side.from_string: Malformed side: '{string}'")
-            print(f"Legal sides are: 'left', ''right', 'top' or 'bottom'")
-            raise ValueError(f"Malformed side: '{string}'")
+        # non-string json values such as lists and dicts are not hashable
+        side = _SIDE_BY_NAME.get(string) if isinstance(string, str) else None
+        if side is None:
+            raise ValueError(
+                f"Malformed side: '{string}'. "
+                + "Legal sides are: 'left', 'right', 'top' or 'bottom'"
+            )
+        return side
+
+
+_SIDE_BY_NAME = {
+    "left": Side.LEFT,
+    "right": Side.RIGHT,
+    "top": Side.TOP,
+    "bottom": Side.BOTTOM,
+}
 
 
 @dataclass
 class SolverParameters:
+    __slots__ = ("problem", "objective", "width", "height", "fraction")
+
     problem: str
     objective: str
     width: float
@@ -37,6 +44,8 @@ class SolverParameters:
 
 @dataclass
 class Flow:
+    __slots__ = ("side", "center", "length", "rate")
+
     side: Side
     center: float
     length: float
@@ -48,12 +57,16 @@ class Flow:
 
 @dataclass
 class Region:
+    __slots__ = ("center", "size")
+
     center: tuple[float, float]
     size: tuple[float, float]
 
 
 @dataclass
 class ForceRegion:
+    __slots__ = ("radius", "center", "value")
+
     radius: float
     center: tuple[float, float]
     value: tuple[float, float]
@@ -61,6 +74,8 @@ class ForceRegion:
 
 @dataclass
 class Traction:
+    __slots__ = ("side", "center", "length", "value")
+
     side: Side
     center: float
     length: float
@@ -70,15 +85,13 @@ class Traction:
         return iter((self.side, self.center, self.length, self.value))
 
 
-def to_tuple(ray: list[float], length: int):
-    if len(ray) != length:
-        print(
-            f"Got array that should have had {length} elements, "
-            + f"but had {len(ray)} instead: '{ray}'"
+def to_pair(ray: list[float]) -> tuple[float, float]:
+    if len(ray) != 2:
+        raise ValueError(
+            f"Malformed list: '{ray}'. Expected 2 elements, got {len(ray)}"
         )
-        raise ValueError(f"Malformed list: '{ray}'")
 
-    return tuple([float(v) for v in ray])
+    return (float(ray[0]), float(ray[1]))
 
 
 def get_elasticity_arguments(design):
@@ -86,8 +99,8 @@ def get_elasticity_arguments(design):
     if region := design.get("force_region"):
         force_region = ForceRegion(
             float(region["radius"]),
-            to_tuple(region["center"], 2),
-            to_tuple(region["value"], 2),
+            to_pair(region["center"]),
+            to_pair(region["value"]),
         )
 
     fixed_sides: list[Side] = []
@@ -102,7 +115,7 @@ def get_elasticity_arguments(design):
                     Side.from_string(traction["side"]),
                     float(traction["center"]),
                     float(traction["length"]),
-                    to_tuple(traction["value"], 2),
+                    to_pair(traction["value"]),
                 )
             )
 
@@ -115,16 +128,14 @@ def get_fluid_arguments(design):
         flows.append(
             Flow(
                 Side.from_string(flow_dict["side"]),
-                flow_dict["center"],
-                flow_dict["length"],
-                flow_dict["rate"],
+                float(flow_dict["center"]),
+                float(flow_dict["length"]),
+                float(flow_dict["rate"]),
             )
         )
 
     if len(design.get("zero_pressure", [])) == 0:
-        total_flow = 0
-        for flow in flows:
-            total_flow += flow.rate * flow.length
+        total_flow = math.fsum(flow.rate * flow.length for flow in flows)
 
         if abs(total_flow) > 1e-14:
             print(f"Error: Illegal design: total flow is {total_flow}, not 0!")
@@ -145,14 +156,8 @@ def get_fluid_arguments(design):
         zero_pressure = sides
 
     max_region = None
-    if design.get("max_region"):
-        center = design["max_region"]["center"]
-        cx, cy = float(center[0]), float(center[1])
-
-        size = design["max_region"]["size"]
-        w, h = float(size[0]), float(size[1])
-
-        max_region = Region((cx, cy), (w, h))
+    if region := design.get("max_region"):
+        max_region = Region(to_pair(region["center"]), to_pair(region["size"]))
     elif design["objective"] == "maximize_flow":
         print("Error: Got maximize flow objective with no max region!")
         exit(1)
@@ -160,22 +165,24 @@ def get_fluid_arguments(design):
     return flows, no_slip, zero_pressure, max_region
 
 
+LEGAL_OBJECTIVES = ("minimize_power", "maximize_flow", "minimize_compliance")
+
+
 def parse_design(filename: str):
     with open(filename, "r") as design_file:
         design = json.load(design_file)
 
-    legal_objectives = ["minimize_power", "maximize_flow", "minimize_compliance"]
-    if not design["objective"] in legal_objectives:
+    if design["objective"] not in LEGAL_OBJECTIVES:
         print(f"Error: Got design with malformed objective: '{design['objective']}'")
-        print(f"Legal objectives are: {', '.join(legal_objectives)}")
+        print(f"Legal objectives are: {', '.join(LEGAL_OBJECTIVES)}")
         exit(1)
 
     parameters = SolverParameters(
         design["problem"],
         design["objective"],
-        design["width"],
-        design["height"],
-        design["fraction"],
+        float(design["width"]),
+        float(design["height"]),
+        float(design["fraction"]),
     )
 
     if design["problem"] == "elasticity":
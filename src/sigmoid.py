@@ -0,0 +1,55 @@
+import math
+
+import numpy as np
+from scipy import special
+
+try:
+    import numba
+except ModuleNotFoundError:
+    numba = None
+
+
+def expit(x):
+    """Sigmoid function."""
+    return special.expit(x)
+
+
+def logit(x):
+    """Inverse sigmoid function."""
+    return special.logit(x)
+
+
+def numpy_expit_integrals(x, c, weights):
+    """Calculate Σ expit(x_i + c)w_i and Σ expit'(x_i + c)w_i using NumPy."""
+    expit_val = expit(x + c)
+    expit_integral = float(expit_val @ weights)
+
+    # expit'(x) = expit(x)(1 - expit(x)), so the sigmoid is evaluated once
+    expit_diff_val = np.multiply(expit_val, 1.0 - expit_val, out=expit_val)
+    return expit_integral, float(expit_diff_val @ weights)
+
+
+def loop_expit_integrals(x, c, weights):
+    """
+    Calculate Σ expit(x_i + c)w_i and Σ expit'(x_i + c)w_i in a single loop.
+    This is slow in pure Python, and is meant to be compiled with numba.
+    """
+    expit_integral = 0.0
+    expit_diff_integral = 0.0
+    for i in range(x.size):
+        # branch on the sign so exp never overflows
+        shifted = x[i] + c
+        if shifted >= 0.0:
+            expit_val = 1.0 / (1.0 + math.exp(-shifted))
+        else:
+            exp_val = math.exp(shifted)
+            expit_val = exp_val / (1.0 + exp_val)
+        expit_integral += expit_val * weights[i]
+        expit_diff_integral += expit_val * (1.0 - expit_val) * weights[i]
+    return expit_integral, expit_diff_integral
+
+
+if numba is not None:
+    expit_integrals = numba.njit(cache=True)(loop_expit_integrals)
+else:
+    expit_integrals = numpy_expit_integrals
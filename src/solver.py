@@ -1,33 +1,24 @@
 import os
-import pickle
+import sys
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 import dolfin as df
 
 from src.problem import Problem
 from src.filter import HelmholtzFilter
-from src.utils import constrain, save_function
+from src.sigmoid import expit, logit, expit_integrals
+from src.utils import constrain, function_to_data, write_pickle
 from designs.design_parser import parse_design
 
 df.set_log_level(df.LogLevel.WARNING)
 # turn off redundant output in parallel
 df.parameters["std_out_all_processes"] = False
 
-
-def expit(x):
-    """Sigmoid function."""
-    return 1.0 / (1.0 + np.exp(-x))
-
-
-def expit_diff(x):
-    """Derivative of the sigmoid function."""
-    expit_val = expit(x)
-    return expit_val * (1 - expit_val)
-
-
-def logit(x):
-    """Inverse sigmoid function."""
-    return np.log(x / (1.0 - x))
+# iteration, objective, Δobjective, Δρ and tolerance columns of the solver log
+LOG_ROW_FORMAT = "{:^9} │ {} │ {} │ {} │ {}"
+# number of log rows buffered before they are written to stdout
+LOG_FLUSH_INTERVAL = 20
 
 
 class Solver:
@@ -70,6 +61,23 @@ class Solver:
         self.rho = df.Function(self.control_space)
         self.rho.vector()[:] = volume_fraction
 
+        # ∫φ_i dx for each basis function φ_i, so that ∫f dx = Σ f_i ∫φ_i dx
+        # can be evaluated as a dot product instead of a form assembly
+        basis_integrals = df.assemble(df.TestFunction(self.control_space) * df.dx)
+        self._basis_integrals = basis_integrals.get_local()
+
+        # mass matrix M, so that ∫(f - g)²dx = (f - g)ᵀM(f - g)
+        trial = df.TrialFunction(self.control_space)
+        test = df.TestFunction(self.control_space)
+        self._mass_matrix = df.assemble(df.inner(trial, test) * df.dx)
+
+        # scratch buffer reused by step
+        self._half_step = np.empty(self.rho.vector().local_size())
+
+        # set by solve, so save_rho can write files in the background
+        self._io_pool = None
+        self._pending_saves = []
+
         control_filter = HelmholtzFilter(epsilon=0.02)
         self.problem.init(control_filter, self.mesh, self.parameters, extra_data)
 
@@ -80,17 +88,17 @@ class Solver:
         and then adding c to half_step.
         """
 
-        expit_integral_func = df.Function(self.control_space)
-        expit_diff_integral_func = df.Function(self.control_space)
+        comm = self.mesh.mpi_comm()
 
-        c = 0
+        c = 0.0
         max_iterations = 10
         for _ in range(max_iterations):
-            expit_integral_func.vector()[:] = expit(half_step + c)
-            expit_diff_integral_func.vector()[:] = expit_diff(half_step + c)
+            expit_integral, expit_diff_integral = expit_integrals(
+                half_step, c, self._basis_integrals
+            )
 
-            error = float(df.assemble(expit_integral_func * df.dx) - volume)
-            derivative = float(df.assemble(expit_diff_integral_func * df.dx))
+            error = df.MPI.sum(comm, expit_integral) - volume
+            derivative = df.MPI.sum(comm, expit_diff_integral)
             if derivative == 0.0:
                 raise ValueError("Got derivative equal to zero while projecting psi")
 
@@ -106,10 +114,13 @@ class Solver:
     def step(self, previous_psi, step_size):
         """Take a entropic mirror descent step with a given step size."""
         # Latent space gradient descent
-        objective_gradient = self.problem.calculate_objective_gradient().vector()[:]
+        objective_gradient = self.problem.calculate_objective_gradient().vector()
+        scaled_gradient = objective_gradient.get_local()
 
-        half_step = previous_psi - step_size * objective_gradient
-        return self.project(half_step, self.volume)
+        # half_step = previous_psi - step_size * objective_gradient, without temporaries
+        np.multiply(scaled_gradient, -step_size, out=scaled_gradient)
+        np.add(previous_psi, scaled_gradient, out=self._half_step)
+        return self.project(self._half_step, self.volume)
 
     def step_size(self, k: int) -> float:
         if self.parameters.problem == "elasticity":
@@ -132,56 +143,95 @@ class Solver:
         objective = float(self.problem.calculate_objective(self.rho))
         objective_difference = None
 
-        print("Iteration │ Objective │ ΔObjective │     Δρ    │ Tolerance ")
-        print("──────────┼───────────┼────────────┼───────────┼───────────")
-
-        def print_values(k, objective, objective_difference, difference):
-            print(
-                f"{k:^9} │ {constrain(objective, 9)} │ "
-                + f"{constrain(objective_difference, 10)} │ "
-                + f"{constrain(difference, 9)} │ "
-                + f"{constrain(self.tolerance(k), 9)}",
-                flush=True,
+        log_rows = [
+            "Iteration │ Objective │ ΔObjective │     Δρ    │ Tolerance ",
+            "──────────┼───────────┼────────────┼───────────┼───────────",
+        ]
+
+        def flush_values():
+            if log_rows:
+                sys.stdout.write("\n".join(log_rows) + "\n")
+                sys.stdout.flush()
+                log_rows.clear()
+
+        flush_values()
+
+        def print_values(
+            k, objective, objective_difference, difference, tolerance=None
+        ):
+            if tolerance is None:
+                tolerance = self.tolerance(k)
+            log_rows.append(
+                LOG_ROW_FORMAT.format(
+                    k,
+                    constrain(objective, 9),
+                    constrain(objective_difference, 10),
+                    constrain(difference, 9),
+                    constrain(tolerance, 9),
+                )
             )
-
-        for k in range(100):
-            print_values(k, objective, objective_difference, difference)
-            if k % self.skip_multiple == 0:
-                self.save_rho(self.rho, objective, k)
-
-            previous_psi = psi.copy()
-            try:
-                psi = self.step(previous_psi, self.step_size(k))
-            except ValueError as e:
-                print_values(k + 1, objective, objective_difference, difference)
-                print(f"EXIT: {e}")
-                break
-
-            self.rho.vector()[:] = expit(psi)
-            previous_objective = objective
-            objective = float(self.problem.calculate_objective(self.rho))
-            objective_difference = previous_objective - objective
-
-            if np.isnan(objective):
+            if len(log_rows) >= LOG_FLUSH_INTERVAL:
+                flush_values()
+
+        # work vectors used to calculate the difference between iterations
+        rho_difference = self.rho.vector().copy()
+        mass_rho_difference = df.Vector()
+        self._mass_matrix.init_vector(mass_rho_difference, 0)
+
+        # data files are written in the background so the solver doesn't wait on disk
+        self._io_pool = ThreadPoolExecutor(max_workers=1)
+        try:
+            for k in range(100):
+                tolerance = self.tolerance(k)
+                print_values(k, objective, objective_difference, difference, tolerance)
+                if k % self.skip_multiple == 0:
+                    self.save_rho(self.rho, objective, k)
+
+                # step returns a new array, so psi can be shared without copying
+                previous_psi = psi
+                try:
+                    psi = self.step(previous_psi, self.step_size(k))
+                except ValueError as e:
+                    print_values(k + 1, objective, objective_difference, difference)
+                    log_rows.append(f"EXIT: {e}")
+                    break
+
+                # keep the current rho so difference doesn't need expit(previous_psi)
+                rho_difference.zero()
+                rho_difference.axpy(1.0, self.rho.vector())
+                self.rho.vector()[:] = expit(psi)
+                previous_objective = objective
+                objective = float(self.problem.calculate_objective(self.rho))
+                objective_difference = previous_objective - objective
+
+                if np.isnan(objective):
+                    print_values(k + 1, objective, objective_difference, difference)
+                    log_rows.append("EXIT: Objective is NaN!")
+                    break
+
+                rho_difference.axpy(-1.0, self.rho.vector())
+                self._mass_matrix.mult(rho_difference, mass_rho_difference)
+                difference = np.sqrt(rho_difference.inner(mass_rho_difference))
+
+                if difference < tolerance:
+                    print_values(k + 1, objective, objective_difference, difference)
+                    log_rows.append("EXIT: Optimal solution found")
+                    break
+            else:
                 print_values(k + 1, objective, objective_difference, difference)
-                print("EXIT: Objective is NaN!")
-                break
+                log_rows.append("EXIT: Iteration did not converge")
 
-            # create dfa functions from previous_psi to calculate difference
-            previous_rho = df.Function(self.control_space)
-            previous_rho.vector()[:] = expit(previous_psi)
-
-            difference = np.sqrt(df.assemble((self.rho - previous_rho) ** 2 * df.dx))
-
-            if difference < self.tolerance(k):
-                print_values(k + 1, objective, objective_difference, difference)
-                print("EXIT: Optimal solution found")
-                break
-        else:
-            print_values(k + 1, objective, objective_difference, difference)
-            print("EXIT: Iteration did not converge")
+            self.save_rho(self.rho, objective, k + 1)
+        except BaseException:
+            # let the original error propagate instead of any failed write
+            self._pending_saves.clear()
+            raise
+        finally:
+            flush_values()
+            self._io_pool.shutdown(wait=True)
+            self._io_pool = None
 
-        self.save_rho(self.rho, objective, k + 1)
+        self.wait_for_saves()
 
     def save_rho(self, rho, objective, k):
         design = os.path.splitext(os.path.basename(self.design_file))[0]
@@ -189,8 +239,24 @@ class Solver:
         os.makedirs(os.path.dirname(file_root), exist_ok=True)
 
         rho_file = file_root + "_rho.dat"
-        save_function(rho, rho_file, "design")
-
+        # get the data now, as rho keeps changing while the files are written
+        rho_data = function_to_data(rho, "design", self.N, (self.width, self.height))
         data = {"objective": objective, "iteration": k, "rho_file": rho_file}
-        with open(file_root + ".dat", "wb") as datafile:
-            pickle.dump(data, datafile)
+
+        for file_data, filename in [(rho_data, rho_file), (data, file_root + ".dat")]:
+            if self._io_pool is None:
+                write_pickle(file_data, filename)
+            else:
+                future = self._io_pool.submit(write_pickle, file_data, filename)
+                self._pending_saves.append(future)
+
+    def wait_for_saves(self):
+        """
+        Wait until all files submitted by save_rho have been written,
+        and raise the error of the first write that failed, if any.
+        """
+        try:
+            for future in self._pending_saves:
+                future.result()
+        finally:
+            self._pending_saves.clear()
@@ -43,3 +43,8 @@ def test_parse_design():
 
     with pytest.raises(ValueError):
         parse_design("tests/test_designs/broken_design.json")
+
+    # sides that are not strings should also be rejected with a ValueError
+    for malformed_side in [["left"], {"side": "left"}, "middle"]:
+        with pytest.raises(ValueError):
+            Side.from_string(malformed_side)
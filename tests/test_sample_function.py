@@ -0,0 +1,71 @@
+import numpy as np
+import dolfin as df
+
+from src.utils import sample_function
+
+
+def create_mesh(N, width, height):
+    return df.Mesh(
+        df.RectangleMesh(
+            df.MPI.comm_world,
+            df.Point(0.0, 0.0),
+            df.Point(width, height),
+            int(width * N),
+            int(height * N),
+        )
+    )
+
+
+def sample_directly(f, N, points, sample_type, domain_size):
+    """Sample f point by point at the coordinates sample_function should use."""
+    multiplier = int(np.ceil(points / N))
+    domain_samples = [int(s * N * multiplier) for s in domain_size]
+
+    samples = []
+    for yi in range(domain_samples[1]):
+        row = []
+        for xi in range(domain_samples[0]):
+            if sample_type == "center":
+                x = (0.5 + xi) / (multiplier * N)
+                y = (0.5 + yi) / (multiplier * N)
+            else:
+                x = xi / (multiplier * N - 1 / domain_size[0])
+                y = yi / (multiplier * N - 1 / domain_size[1])
+            row.append(np.atleast_1d(f(x, y)))
+        samples.append(row)
+
+    return np.array(samples)
+
+
+def test_sample_scalar_function():
+    N = 5
+    mesh = create_mesh(N, 1.0, 1.0)
+    function_space = df.FunctionSpace(mesh, "CG", 1)
+
+    f = df.Function(function_space)
+    np.random.seed(198)
+    f.vector()[:] = np.random.random(len(f.vector()[:]))
+
+    for sample_type in ["center", "edges"]:
+        _, sampled = sample_function(f, 12, sample_type)
+        expected = sample_directly(f, N, 12, sample_type, (1.0, 1.0))
+
+        assert sampled.shape == expected.shape
+        assert np.max(np.abs(sampled - expected)) < 1e-12
+
+
+def test_sample_vector_function():
+    N = 4
+    domain_size = (2.0, 1.0)
+    mesh = create_mesh(N, *domain_size)
+    function_space = df.VectorFunctionSpace(mesh, "CG", 1)
+
+    f = df.Function(function_space)
+    f.interpolate(df.Expression(("x[0]*x[1]", "x[0] - 2*x[1]"), degree=2))
+
+    for sample_type in ["center", "edges"]:
+        _, sampled = sample_function(f, 10, sample_type)
+        expected = sample_directly(f, N, 10, sample_type, domain_size)
+
+        assert sampled.shape == expected.shape
+        assert np.max(np.abs(sampled - expected)) < 1e-12
@@ -0,0 +1,21 @@
+import numpy as np
+
+from src.sigmoid import expit_integrals, loop_expit_integrals, numpy_expit_integrals
+
+
+def test_expit_integrals():
+    np.random.seed(198)
+    # large values check that neither implementation overflows
+    x = 50 * np.random.normal(size=1000)
+    weights = np.random.random(1000)
+
+    for c in [-3.0, 0.0, 0.7]:
+        numpy_integrals = numpy_expit_integrals(x, c, weights)
+        loop_integrals = loop_expit_integrals(x, c, weights)
+        chosen_integrals = expit_integrals(x, c, weights)
+
+        for expected, loop, chosen in zip(
+            numpy_integrals, loop_integrals, chosen_integrals
+        ):
+            assert abs(loop - expected) < 1e-12 * abs(expected)
+            assert abs(chosen - expected) < 1e-12 * abs(expected)